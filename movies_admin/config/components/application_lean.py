@@ -0,0 +1,16 @@
+# Application definition for non-admin processes (management commands, workers)
+# Admin, sessions, messages and staticfiles are not loaded, so django.setup()
+# does not import their models, checks and template machinery.
+
+INSTALLED_APPS = [
+    'django.contrib.contenttypes',
+    'movies.apps.MoviesConfig',
+]
+
+MIDDLEWARE = []
+
+ROOT_URLCONF = 'config.urls_lean'
+
+TEMPLATES = []
+
+WSGI_APPLICATION = 'config.wsgi.application'
@@ -0,0 +1,15 @@
+# Settings shared by every profile (config.settings, config.settings_lean)
+from pathlib import Path
+from dotenv import load_dotenv
+from split_settings.tools import include
+
+load_dotenv()
+
+# Build paths inside the project like this: BASE_DIR / 'subdir'.
+# split_settings keeps __file__ pointing at the settings module that includes this file.
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+LOCALE_PATHS = ['movies/locale']
+
+include('security.py', 'password_validation.py', 'database.py', 'internationalization.py',
+        'static.py', 'default_pk_field_type.py')
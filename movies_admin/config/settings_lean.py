@@ -0,0 +1,12 @@
+"""
+Lean Django settings for short-lived non-admin processes.
+
+Used by management commands, cron jobs and workers that only need the ORM:
+    DJANGO_SETTINGS_MODULE=config.settings_lean python manage.py <command>
+
+Schema migrations and anything touching the admin must keep using
+config.settings, otherwise the tables of the admin stack are not managed.
+"""
+from split_settings.tools import include
+
+include('components/common.py', 'components/application_lean.py')
@@ -0,0 +1,7 @@
+"""
+URL configuration for the lean settings profile.
+
+The admin is not installed in this profile, so there is nothing to route.
+"""
+
+urlpatterns = []
@@ -1,5 +1,14 @@
-from django.contrib import admin
-from .models import FilmWork, Genre, Person, GenreFilmWork, PersonFilmWork
+import uuid
+
+from django.contrib import admin, messages
+from django.core.exceptions import PermissionDenied
+from django.http import FileResponse, StreamingHttpResponse
+from django.template.response import TemplateResponse
+from django.utils.translation import gettext, gettext_lazy as _
+
+from .export import XLSX_MAX_ROWS, stream_csv, write_xlsx
+from .models import FilmWork, Genre, Person, GenreFilmWork, PersonFilmWork, GenreStatistics
+from .statistics import genre_statistics, genre_year_statistics, top_persons
 
 
 class GenreFilmWorkInline(admin.TabularInline):
@@ -33,6 +42,26 @@ class FilmWorkAdmin(admin.ModelAdmin):
     get_genres.short_description = 'Жанры фильма'
     list_filter = ('type', 'creation_date', 'rating',)
     search_fields = ('title', 'description', 'id', 'creation_date',)
+    actions = ('export_csv', 'export_xlsx')
+
+    @admin.action(description=_('export_csv'))
+    def export_csv(self, request, queryset):
+        response = StreamingHttpResponse(stream_csv(queryset), content_type='text/csv')
+        response['Content-Disposition'] = 'attachment; filename="film_works.csv"'
+        return response
+
+    @admin.action(description=_('export_xlsx'))
+    def export_xlsx(self, request, queryset):
+        if queryset.count() > XLSX_MAX_ROWS:
+            self.message_user(request, gettext('xlsx_too_many_rows') % {'rows': XLSX_MAX_ROWS},
+                              messages.ERROR)
+            return None
+        try:
+            output = write_xlsx(queryset)
+        except ImportError:
+            self.message_user(request, gettext('xlsx_requires_openpyxl'), messages.ERROR)
+            return None
+        return FileResponse(output, as_attachment=True, filename='film_works.xlsx')
 
 
 @admin.register(Genre)
@@ -46,3 +75,36 @@ class GenreAdmin(admin.ModelAdmin):
 class PersonAdmin(admin.ModelAdmin):
     list_display = ('full_name',)
     search_fields = ('full_name', 'id',)
+
+
+@admin.register(GenreStatistics)
+class StatisticsDashboardAdmin(admin.ModelAdmin):
+    """Дашборд читает только предрассчитанные агрегаты, см. movies.statistics"""
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+    def changelist_view(self, request, extra_context=None):
+        if not self.has_view_permission(request):
+            raise PermissionDenied
+        try:
+            genre_id = uuid.UUID(request.GET.get('genre', ''))
+        except ValueError:
+            genre_id = None
+        context = {
+            **self.admin_site.each_context(request),
+            'title': _('catalog_statistics'),
+            'opts': self.model._meta,
+            'genres': genre_statistics(),
+            'selected_genre': genre_id,
+            'years': genre_year_statistics(genre_id) if genre_id else (),
+            'top_persons': top_persons(),
+            **(extra_context or {}),
+        }
+        return TemplateResponse(request, 'admin/movies/statistics_dashboard.html', context)
@@ -0,0 +1,213 @@
+import json
+import statistics
+import time
+import tracemalloc
+import uuid
+from dataclasses import dataclass, asdict
+from typing import Callable
+
+from django.contrib.auth import get_user_model
+from django.db import connection, models, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .models import GenreFilmWork
+
+SEED_BATCH_SIZE = 100_000
+# Хост пустой или путь к unix-сокету тоже означает локальную базу
+LOCAL_DATABASE_HOSTS = ('', 'localhost', '127.0.0.1', '::1')
+
+# Популярность жанров и персон неравномерна: random()^2 смещает выбор к началу массива
+SEED_FILM_WORKS_QUERY = '''
+WITH genres AS (SELECT array_agg(id) AS ids FROM content.genre),
+persons AS (SELECT array_agg(id) AS ids FROM content.person),
+films AS (
+    INSERT INTO content.film_work (id, title, description, creation_date, rating, type, created, modified)
+    SELECT gen_random_uuid(), 'Film ' || n, 'Synthetic description of film ' || n,
+           date '1930-01-01' + floor(random() * 34000)::int, round((random() * 100)::numeric, 1),
+           CASE WHEN random() < 0.8 THEN 'movie' ELSE 'tv_show' END, now(), now()
+    FROM generate_series(%(start)s, %(stop)s) AS n
+    RETURNING id
+),
+genre_links AS (
+    INSERT INTO content.genre_film_work (id, genre_id, film_work_id, created)
+    SELECT gen_random_uuid(), genre_id, film_work_id, now()
+    FROM (SELECT DISTINCT films.id AS film_work_id,
+                 genres.ids[1 + floor(array_length(genres.ids, 1) * random() ^ 2)::int] AS genre_id
+          FROM films, genres, generate_series(1, %(genres_per_film)s)) AS links
+)
+INSERT INTO content.person_film_work (id, person_id, film_work_id, role, created)
+SELECT gen_random_uuid(), person_id, film_work_id,
+       (ARRAY['actor', 'actor', 'actor', 'actor', 'writer', 'director'])[1 + floor(random() * 6)::int], now()
+FROM (SELECT DISTINCT films.id AS film_work_id,
+             persons.ids[1 + floor(array_length(persons.ids, 1) * random() ^ 2)::int] AS person_id
+      FROM films, persons, generate_series(1, %(persons_per_film)s)) AS links;
+'''
+
+
+@dataclass
+class ScenarioResult:
+    path: str
+    runs: int
+    queries: int
+    p50_ms: float
+    p95_ms: float
+    peak_memory_kb: float
+
+
+def is_local_database() -> bool:
+    """Сид и замеры пишут в базу, без явного разрешения допускается только локальная"""
+    host = connection.settings_dict.get('HOST') or ''
+    return host in LOCAL_DATABASE_HOSTS or host.startswith('/')
+
+
+def seed_catalog(film_works: int, genres: int, persons: int,
+                 genres_per_film: int, persons_per_film: int,
+                 progress: Callable[[int], None] = lambda seeded: None) -> None:
+    """Наполнение базы синтетическим каталогом, по транзакции на пачку кинопроизведений"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO content.genre (id, name, description, created, modified) "
+            "SELECT gen_random_uuid(), 'Genre ' || n, NULL, now(), now() "
+            "FROM generate_series(1, %s) AS n ON CONFLICT DO NOTHING;", [genres])
+        cursor.execute(
+            "INSERT INTO content.person (id, full_name, created, modified) "
+            "SELECT gen_random_uuid(), 'Person ' || n, now(), now() "
+            "FROM generate_series(1, %s) AS n ON CONFLICT DO NOTHING;", [persons])
+
+    for start in range(1, film_works + 1, SEED_BATCH_SIZE):
+        stop = min(start + SEED_BATCH_SIZE - 1, film_works)
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(SEED_FILM_WORKS_QUERY, {
+                'start': start,
+                'stop': stop,
+                'genres_per_film': genres_per_film,
+                'persons_per_film': persons_per_film,
+            })
+        progress(stop)
+
+
+def get_scenarios() -> dict[str, str | None]:
+    """Сценарии: changelist, поиск, фильтр, форма с inline и autocomplete.
+
+    Форма кинопроизведения недоступна (None), пока в базе нет связей с жанрами.
+    """
+    film_work_id = GenreFilmWork.objects.values_list('film_work_id', flat=True).first()
+    autocomplete = reverse('admin:autocomplete')
+    scenarios = {
+        'filmwork_changelist': reverse('admin:movies_filmwork_changelist'),
+        'filmwork_search': reverse('admin:movies_filmwork_changelist') + '?q=Film+42',
+        'filmwork_filter': reverse('admin:movies_filmwork_changelist') + '?type__exact=tv_show',
+        'genre_changelist': reverse('admin:movies_genre_changelist'),
+        'genre_search': reverse('admin:movies_genre_changelist') + '?q=Genre+1',
+        'person_changelist': reverse('admin:movies_person_changelist'),
+        'person_search': reverse('admin:movies_person_changelist') + '?q=Person+42',
+        'genre_autocomplete': autocomplete + '?app_label=movies&model_name=genrefilmwork&field_name=genre&term=Gen',
+        'person_autocomplete': autocomplete + '?app_label=movies&model_name=personfilmwork&field_name=person&term=Person+1',
+        'filmwork_change': reverse('admin:movies_filmwork_change', args=[film_work_id]) if film_work_id else None,
+    }
+    return scenarios
+
+
+def select_scenarios(only: list[str] | None = None) -> dict[str, str]:
+    """Выбор сценариев; неизвестный или недоступный сценарий - ошибка, а не пропуск"""
+    scenarios = get_scenarios()
+    unknown = sorted(set(only or ()) - set(scenarios))
+    if unknown:
+        raise ValueError(f'Unknown scenarios: {", ".join(unknown)}; available: {", ".join(scenarios)}')
+    selected = {name: scenarios[name] for name in only or scenarios}
+    unavailable = [name for name, path in selected.items() if path is None]
+    if unavailable:
+        raise ValueError(f'Scenarios need a seeded catalog: {", ".join(unavailable)}; run seed_catalog first')
+    return selected
+
+
+def _benchmark_user() -> models.Model:
+    """Временный суперпользователь, удаляется в run_benchmarks"""
+    return get_user_model().objects.create(
+        username=f'benchmark-{uuid.uuid4().hex[:12]}', is_staff=True, is_superuser=True)
+
+
+def _percentile(values: list[float], percent: int) -> float:
+    if len(values) < 2:
+        return values[0]
+    return statistics.quantiles(values, n=100, method='inclusive')[percent - 1]
+
+
+def run_scenario(client: Client, path: str, runs: int, warmup: int = 1) -> ScenarioResult:
+    """Замер одного сценария; память меряется отдельным прогоном, tracemalloc искажает время"""
+    for _ in range(warmup):
+        client.get(path)
+
+    latencies = []
+    queries = 0
+    for _ in range(runs):
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = client.get(path)
+            latencies.append((time.perf_counter() - started) * 1000)
+        if response.status_code != 200:
+            raise RuntimeError(f'{path} responded with {response.status_code}')
+        queries = max(queries, len(captured))
+
+    tracemalloc.start()
+    try:
+        client.get(path)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return ScenarioResult(
+        path=path,
+        runs=runs,
+        queries=queries,
+        p50_ms=round(statistics.median(latencies), 2),
+        p95_ms=round(_percentile(latencies, 95), 2),
+        peak_memory_kb=round(peak / 1024, 1),
+    )
+
+
+def run_benchmarks(runs: int, only: list[str] | None = None) -> dict[str, ScenarioResult]:
+    scenarios = select_scenarios(only)
+    user = _benchmark_user()
+    client = Client(HTTP_HOST='localhost')
+    try:
+        client.force_login(user)
+        return {name: run_scenario(client, path, runs) for name, path in scenarios.items()}
+    finally:
+        # logout удаляет сессию, удаление пользователя - его записи в журнале админки
+        client.logout()
+        user.delete()
+
+
+def save_report(results: dict[str, ScenarioResult], path: str) -> None:
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'scenarios': {name: asdict(result) for name, result in results.items()},
+    }
+    with open(path, 'w') as file:
+        json.dump(report, file, indent=2)
+
+
+def find_regressions(results: dict[str, ScenarioResult], baseline_path: str,
+                     threshold: float) -> list[str]:
+    """Сравнение с прошлым отчётом: рост числа запросов или p95/памяти больше threshold.
+
+    Сценарий из прошлого отчёта, не попавший в текущий прогон, тоже считается регрессией.
+    """
+    with open(baseline_path) as file:
+        baseline = json.load(file)['scenarios']
+
+    regressions = [f'{name}: missing from the current run' for name in baseline if name not in results]
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        if result.queries > previous['queries']:
+            regressions.append(f'{name}: queries {previous["queries"]} -> {result.queries}')
+        for metric in ('p95_ms', 'peak_memory_kb'):
+            before, after = previous[metric], getattr(result, metric)
+            if before and after > before * (1 + threshold):
+                regressions.append(f'{name}: {metric} {before} -> {after}')
+    return regressions
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from movies.benchmarks import find_regressions, is_local_database, run_benchmarks, save_report
+
+
+class Command(BaseCommand):
+    help = 'Benchmark admin changelists, search, filters, change form and autocomplete'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=20, help='measured requests per scenario')
+        parser.add_argument('--scenario', action='append', help='scenario to run, all by default')
+        parser.add_argument('--output', default='benchmark_admin.json', help='JSON report path')
+        parser.add_argument('--baseline', help='previous JSON report to compare with')
+        parser.add_argument('--threshold', type=float, default=0.2,
+                            help='allowed relative growth of p95 latency and memory')
+        parser.add_argument('--yes', action='store_true',
+                            help='allow running against a non-local database')
+
+    def handle(self, *args, **options):
+        if not options['yes'] and not is_local_database():
+            raise CommandError('The database is not local, pass --yes to benchmark it anyway')
+        try:
+            results = run_benchmarks(options['runs'], options['scenario'])
+        except ValueError as err:
+            raise CommandError(err)
+        for name, result in results.items():
+            self.stdout.write(f'{name}: {result.queries} queries, p50 {result.p50_ms} ms, '
+                              f'p95 {result.p95_ms} ms, peak {result.peak_memory_kb} KB')
+        save_report(results, options['output'])
+
+        if options['baseline']:
+            regressions = find_regressions(results, options['baseline'], options['threshold'])
+            if regressions:
+                raise CommandError('Regressions found:\n' + '\n'.join(regressions))
+            self.stdout.write(self.style.SUCCESS('No regressions against baseline'))
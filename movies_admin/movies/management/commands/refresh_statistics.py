@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from movies.statistics import refresh_statistics
+
+
+class Command(BaseCommand):
+    help = 'Refresh precomputed genre and person statistics'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--full', action='store_true',
+                            help='rebuild all statistics instead of the changed rows only')
+
+    def handle(self, *args, **options):
+        result = refresh_statistics(full=options['full'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Statistics refreshed: {result["genres"]} genre rows, {result["persons"]} person rows'
+        ))
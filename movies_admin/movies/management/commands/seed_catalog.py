@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from movies.benchmarks import is_local_database, seed_catalog
+
+
+class Command(BaseCommand):
+    help = 'Seed the database with a synthetic catalog for benchmarks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--film-works', type=int, default=10_000)
+        parser.add_argument('--genres', type=int, default=30)
+        parser.add_argument('--persons', type=int,
+                            help='number of persons, half of the film works by default')
+        parser.add_argument('--genres-per-film', type=int, default=3)
+        parser.add_argument('--persons-per-film', type=int, default=8)
+        parser.add_argument('--yes', action='store_true',
+                            help='allow seeding a non-local database')
+
+    def handle(self, *args, **options):
+        if not options['yes'] and not is_local_database():
+            raise CommandError('The database is not local, pass --yes to seed it anyway')
+        film_works = options['film_works']
+        seed_catalog(
+            film_works=film_works,
+            genres=options['genres'],
+            persons=options['persons'] or max(film_works // 2, 1),
+            genres_per_film=options['genres_per_film'],
+            persons_per_film=options['persons_per_film'],
+            progress=lambda seeded: self.stdout.write(f'Seeded {seeded}/{film_works} film works'),
+        )
+        self.stdout.write(self.style.SUCCESS('Catalog seeded'))
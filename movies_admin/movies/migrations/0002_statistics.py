@@ -0,0 +1,98 @@
+# Generated by Django 4.2.11 on 2026-10-19 10:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GenreStatistics',
+            fields=[
+                ('genre', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to='movies.genre', verbose_name='genre')),
+                ('film_count', models.PositiveIntegerField(default=0, verbose_name='film_count')),
+                ('average_rating', models.FloatField(null=True, verbose_name='average_rating')),
+            ],
+            options={
+                'verbose_name': 'genre_statistics',
+                'verbose_name_plural': 'genres_statistics',
+                'db_table': 'content"."genre_statistics',
+            },
+        ),
+        migrations.CreateModel(
+            name='StatisticsRefresh',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('refreshed_at', models.DateTimeField(null=True)),
+            ],
+            options={
+                'db_table': 'content"."statistics_refresh',
+            },
+        ),
+        migrations.CreateModel(
+            name='GenreYearStatistics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField(verbose_name='year')),
+                ('film_count', models.PositiveIntegerField(default=0, verbose_name='film_count')),
+                ('average_rating', models.FloatField(null=True, verbose_name='average_rating')),
+                ('genre', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='movies.genre', verbose_name='genre')),
+            ],
+            options={
+                'verbose_name': 'genre_year_statistics',
+                'verbose_name_plural': 'genres_years_statistics',
+                'db_table': 'content"."genre_year_statistics',
+            },
+        ),
+        migrations.CreateModel(
+            name='PersonRoleStatistics',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(choices=[('actor', 'actor'), ('writer', 'writer'), ('director', 'director')], max_length=255, verbose_name='role')),
+                ('film_count', models.PositiveIntegerField(default=0, verbose_name='film_count')),
+                ('person', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='movies.person', verbose_name='person')),
+            ],
+            options={
+                'verbose_name': 'person_role_statistics',
+                'verbose_name_plural': 'persons_roles_statistics',
+                'db_table': 'content"."person_role_statistics',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='genreyearstatistics',
+            constraint=models.UniqueConstraint(fields=('genre', 'year'), name='genre_year_statistics_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='personrolestatistics',
+            constraint=models.UniqueConstraint(fields=('person', 'role'), name='person_role_statistics_uniq'),
+        ),
+        migrations.AddIndex(
+            model_name='personrolestatistics',
+            index=models.Index(fields=['role', '-film_count'], name='prs_role_film_count_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='genre',
+            index=models.Index(fields=['modified'], name='genre_modified_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='person',
+            index=models.Index(fields=['modified'], name='person_modified_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='filmwork',
+            index=models.Index(fields=['modified'], name='film_work_modified_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='genrefilmwork',
+            index=models.Index(fields=['created'], name='gfw_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='personfilmwork',
+            index=models.Index(fields=['created'], name='pfw_created_idx'),
+        ),
+    ]
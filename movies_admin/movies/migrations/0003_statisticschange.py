@@ -0,0 +1,25 @@
+# Generated by Django 4.2.11 on 2026-10-19 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0002_statistics'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatisticsChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('genre', 'genre'), ('person', 'person')], max_length=255)),
+                ('object_id', models.UUIDField()),
+                ('created', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'db_table': 'content"."statistics_change',
+            },
+        ),
+    ]
@@ -0,0 +1,100 @@
+# Generated by Django 4.2.11 on 2026-10-19 14:00
+
+from django.db import migrations
+
+# Триггеры уровня оператора: одна вставка в журнал на весь INSERT/UPDATE/DELETE,
+# включая загрузку sqlite_to_postgres и каскадное удаление связей
+STATISTICS_TRIGGERS_SQL = '''
+CREATE OR REPLACE FUNCTION content.record_link_change() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        EXECUTE format('INSERT INTO content.statistics_change (kind, object_id, created) '
+                       'SELECT DISTINCT %L, %I, now() FROM old_rows', TG_ARGV[0], TG_ARGV[1]);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        EXECUTE format('INSERT INTO content.statistics_change (kind, object_id, created) '
+                       'SELECT DISTINCT %L, %I, now() FROM new_rows', TG_ARGV[0], TG_ARGV[1]);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION content.record_film_work_change() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO content.statistics_change (kind, object_id, created)
+    SELECT DISTINCT 'genre', gfw.genre_id, now()
+    FROM new_rows n
+    JOIN old_rows o ON o.id = n.id
+    JOIN content.genre_film_work gfw ON gfw.film_work_id = n.id
+    WHERE n.rating IS DISTINCT FROM o.rating OR n.creation_date IS DISTINCT FROM o.creation_date;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER gfw_statistics_insert AFTER INSERT ON content.genre_film_work
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION content.record_link_change('genre', 'genre_id');
+CREATE TRIGGER gfw_statistics_update AFTER UPDATE ON content.genre_film_work
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION content.record_link_change('genre', 'genre_id');
+CREATE TRIGGER gfw_statistics_delete AFTER DELETE ON content.genre_film_work
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION content.record_link_change('genre', 'genre_id');
+
+CREATE TRIGGER pfw_statistics_insert AFTER INSERT ON content.person_film_work
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION content.record_link_change('person', 'person_id');
+CREATE TRIGGER pfw_statistics_update AFTER UPDATE ON content.person_film_work
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION content.record_link_change('person', 'person_id');
+CREATE TRIGGER pfw_statistics_delete AFTER DELETE ON content.person_film_work
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION content.record_link_change('person', 'person_id');
+
+CREATE TRIGGER film_work_statistics_update AFTER UPDATE ON content.film_work
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION content.record_film_work_change();
+'''
+
+DROP_STATISTICS_TRIGGERS_SQL = '''
+DROP TRIGGER IF EXISTS gfw_statistics_insert ON content.genre_film_work;
+DROP TRIGGER IF EXISTS gfw_statistics_update ON content.genre_film_work;
+DROP TRIGGER IF EXISTS gfw_statistics_delete ON content.genre_film_work;
+DROP TRIGGER IF EXISTS pfw_statistics_insert ON content.person_film_work;
+DROP TRIGGER IF EXISTS pfw_statistics_update ON content.person_film_work;
+DROP TRIGGER IF EXISTS pfw_statistics_delete ON content.person_film_work;
+DROP TRIGGER IF EXISTS film_work_statistics_update ON content.film_work;
+DROP FUNCTION IF EXISTS content.record_link_change();
+DROP FUNCTION IF EXISTS content.record_film_work_change();
+'''
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('movies', '0003_statisticschange'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='genre',
+            name='genre_modified_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='person',
+            name='person_modified_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='filmwork',
+            name='film_work_modified_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='genrefilmwork',
+            name='gfw_created_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='personfilmwork',
+            name='pfw_created_idx',
+        ),
+        migrations.RunSQL(STATISTICS_TRIGGERS_SQL, DROP_STATISTICS_TRIGGERS_SQL),
+    ]
@@ -136,3 +136,84 @@ class PersonFilmWork(UUIDMixin):
                 name='pfw_id_film_work_id_idx',
             ),
         ]
+
+
+class GenreStatistics(models.Model):
+    genre = models.OneToOneField(Genre, on_delete=models.CASCADE, primary_key=True,
+                                 verbose_name=_('genre'))
+    film_count = models.PositiveIntegerField(_('film_count'), default=0)
+    average_rating = models.FloatField(_('average_rating'), null=True)
+
+    def __str__(self):
+        return str(self.genre)
+
+    class Meta:
+        db_table = "content\".\"genre_statistics"
+        verbose_name = _('genre_statistics')
+        verbose_name_plural = _('genres_statistics')
+
+
+class GenreYearStatistics(models.Model):
+    genre = models.ForeignKey(Genre, on_delete=models.CASCADE,
+                              verbose_name=_('genre'))
+    year = models.PositiveSmallIntegerField(_('year'))
+    film_count = models.PositiveIntegerField(_('film_count'), default=0)
+    average_rating = models.FloatField(_('average_rating'), null=True)
+
+    class Meta:
+        db_table = "content\".\"genre_year_statistics"
+        verbose_name = _('genre_year_statistics')
+        verbose_name_plural = _('genres_years_statistics')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['genre', 'year'],
+                name='genre_year_statistics_uniq',
+            ),
+        ]
+
+
+class PersonRoleStatistics(models.Model):
+    person = models.ForeignKey(Person, on_delete=models.CASCADE,
+                               verbose_name=_('person'))
+    role = models.CharField(_('role'), max_length=255,
+                            choices=PersonFilmWork.Role.choices)
+    film_count = models.PositiveIntegerField(_('film_count'), default=0)
+
+    class Meta:
+        db_table = "content\".\"person_role_statistics"
+        verbose_name = _('person_role_statistics')
+        verbose_name_plural = _('persons_roles_statistics')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['person', 'role'],
+                name='person_role_statistics_uniq',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['role', '-film_count'],
+                name='prs_role_film_count_idx',
+            ),
+        ]
+
+
+class StatisticsRefresh(models.Model):
+    refreshed_at = models.DateTimeField(null=True)
+
+    class Meta:
+        db_table = "content\".\"statistics_refresh"
+
+
+# Журнал изменений заполняют триггеры Postgres (migrations/0004_statistics_triggers),
+# поэтому в него попадают и изменения в обход Django, например загрузка sqlite_to_postgres
+class StatisticsChange(models.Model):
+    class Kind(models.TextChoices):
+        genre = 'genre', _('genre')
+        person = 'person', _('person')
+
+    kind = models.CharField(max_length=255, choices=Kind.choices)
+    object_id = models.UUIDField()
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "content\".\"statistics_change"
@@ -0,0 +1,146 @@
+from itertools import islice
+from typing import Iterable
+
+from django.db import connection, models, transaction
+from django.db.models import Avg, Count
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import ExtractYear
+from django.utils import timezone
+
+from .models import (GenreFilmWork, GenreStatistics, GenreYearStatistics, PersonFilmWork,
+                     PersonRoleStatistics, StatisticsChange, StatisticsRefresh)
+
+STATISTICS_BATCH_SIZE = 2000
+TOP_PERSONS_LIMIT = 10
+CHANGED_TABLE = 'statistics_changed'
+
+
+def _bulk_create(model: type[models.Model], rows: Iterable[dict]) -> int:
+    """Вставка агрегатов пачками, без загрузки всего результата в память"""
+    rows = iter(rows)
+    created = 0
+    while batch := list(islice(rows, STATISTICS_BATCH_SIZE)):
+        model.objects.bulk_create([model(**row) for row in batch])
+        created += len(batch)
+    return created
+
+
+def _take_changes() -> None:
+    """Перенос журнала изменений во временную таблицу одним DELETE ... RETURNING.
+
+    Забираются ровно удалённые записи: закоммиченные позже останутся в журнале
+    до следующего обновления.
+    """
+    change_table = connection.ops.quote_name(StatisticsChange._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(f'CREATE TEMP TABLE {CHANGED_TABLE} (kind VARCHAR(255), object_id UUID, '
+                       f'PRIMARY KEY (kind, object_id)) ON COMMIT DROP;')
+        cursor.execute(
+            f'WITH taken AS (DELETE FROM {change_table} RETURNING kind, object_id) '
+            f'INSERT INTO {CHANGED_TABLE} (kind, object_id) SELECT DISTINCT kind, object_id FROM taken;'
+        )
+        cursor.execute(f'ANALYZE {CHANGED_TABLE};')
+
+
+def _drop_changes() -> None:
+    with connection.cursor() as cursor:
+        cursor.execute(f'DROP TABLE {CHANGED_TABLE};')
+
+
+def _changed(kind: str) -> RawSQL:
+    """Подзапрос id изменённых жанров или персон, сами id в Python не читаются"""
+    return RawSQL(f'SELECT object_id FROM {CHANGED_TABLE} WHERE kind = %s', (kind,))
+
+
+def _refresh_genres(genre_ids: RawSQL | None) -> int:
+    """Пересчёт агрегатов по жанрам; None - по всем жанрам"""
+    links = GenreFilmWork.objects.all()
+    genre_statistics = GenreStatistics.objects.all()
+    genre_year_statistics = GenreYearStatistics.objects.all()
+    if genre_ids is not None:
+        links = links.filter(genre_id__in=genre_ids)
+        genre_statistics = genre_statistics.filter(genre_id__in=genre_ids)
+        genre_year_statistics = genre_year_statistics.filter(genre_id__in=genre_ids)
+    genre_statistics.delete()
+    genre_year_statistics.delete()
+
+    created = _bulk_create(GenreStatistics, (
+        links
+        .values('genre_id')
+        .annotate(film_count=Count('film_work_id', distinct=True),
+                  average_rating=Avg('film_work__rating'))
+        .iterator(chunk_size=STATISTICS_BATCH_SIZE)
+    ))
+    created += _bulk_create(GenreYearStatistics, (
+        links
+        .filter(film_work__creation_date__isnull=False)
+        .values('genre_id', year=ExtractYear('film_work__creation_date'))
+        .annotate(film_count=Count('film_work_id', distinct=True),
+                  average_rating=Avg('film_work__rating'))
+        .iterator(chunk_size=STATISTICS_BATCH_SIZE)
+    ))
+    return created
+
+
+def _refresh_persons(person_ids: RawSQL | None) -> int:
+    """Пересчёт числа фильмов персон по ролям; None - по всем персонам"""
+    links = PersonFilmWork.objects.all()
+    person_statistics = PersonRoleStatistics.objects.all()
+    if person_ids is not None:
+        links = links.filter(person_id__in=person_ids)
+        person_statistics = person_statistics.filter(person_id__in=person_ids)
+    person_statistics.delete()
+
+    return _bulk_create(PersonRoleStatistics, (
+        links
+        .values('person_id', 'role')
+        .annotate(film_count=Count('film_work_id', distinct=True))
+        .iterator(chunk_size=STATISTICS_BATCH_SIZE)
+    ))
+
+
+@transaction.atomic
+def refresh_statistics(full: bool = False) -> dict[str, int]:
+    """Обновление агрегатов.
+
+    По умолчанию пересчитываются только жанры и персоны из журнала изменений,
+    который заполняют триггеры Postgres. Первый запуск и full=True пересчитывают всё.
+    """
+    state = StatisticsRefresh.objects.select_for_update().first() or StatisticsRefresh.objects.create()
+    _take_changes()
+
+    if full or state.refreshed_at is None:
+        genre_ids = person_ids = None
+    else:
+        genre_ids = _changed(StatisticsChange.Kind.genre)
+        person_ids = _changed(StatisticsChange.Kind.person)
+
+    result = {
+        'genres': _refresh_genres(genre_ids),
+        'persons': _refresh_persons(person_ids),
+    }
+    _drop_changes()
+    state.refreshed_at = timezone.now()
+    state.save(update_fields=['refreshed_at'])
+    return result
+
+
+def genre_statistics() -> models.QuerySet:
+    return GenreStatistics.objects.select_related('genre').order_by('-film_count', 'genre__name')
+
+
+def genre_year_statistics(genre_id) -> models.QuerySet:
+    return GenreYearStatistics.objects.filter(genre_id=genre_id).order_by('year')
+
+
+def top_persons(limit: int = TOP_PERSONS_LIMIT) -> dict[str, list[PersonRoleStatistics]]:
+    """Самые активные персоны по каждой роли, читается по индексу (role, -film_count)"""
+    return {
+        role.label: list(
+            PersonRoleStatistics.objects
+            .filter(role=role)
+            .select_related('person')
+            .order_by('-film_count')[:limit]
+        )
+        for role in PersonFilmWork.Role
+    }
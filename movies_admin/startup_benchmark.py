@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+"""Cold-start benchmark of Django settings profiles.
+
+Every run starts a fresh interpreter, so the numbers include interpreter
+start-up, settings loading and django.setup(). Usage:
+    python startup_benchmark.py --runs 10 --top 15
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent
+
+PROFILES = {
+    'full': 'config.settings',
+    'lean': 'config.settings_lean',
+}
+
+# Выполняется в отдельном интерпретаторе, результат печатается в stdout
+PROBE = '''
+import json, time
+started = time.perf_counter()
+import django
+from django.conf import settings
+settings.INSTALLED_APPS
+settings_loaded = time.perf_counter()
+django.setup()
+finished = time.perf_counter()
+print(json.dumps({
+    'settings': settings_loaded - started,
+    'setup': finished - settings_loaded,
+}))
+'''
+
+
+def _run_probe(settings_module: str, importtime: bool = False) -> tuple[dict, float, str]:
+    """Метод запуска одного холодного старта в новом процессе"""
+    env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings_module)
+    command = [sys.executable]
+    if importtime:
+        command += ['-X', 'importtime']
+    command += ['-c', PROBE]
+
+    started = time.perf_counter()
+    result = subprocess.run(command, cwd=BASE_DIR, env=env, capture_output=True, text=True)
+    wall = time.perf_counter() - started
+    if result.returncode != 0:
+        raise RuntimeError(f'Probe for {settings_module} failed:\n{result.stderr}')
+    return json.loads(result.stdout.strip().splitlines()[-1]), wall, result.stderr
+
+
+def _parse_importtime(stderr: str, top: int) -> list[dict]:
+    """Метод разбора вывода -X importtime, самые дорогие модули по cumulative"""
+    modules = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        modules.append({
+            'module': name.strip(),
+            'self_ms': int(self_us) / 1000,
+            'cumulative_ms': int(cumulative_us) / 1000,
+        })
+    return sorted(modules, key=lambda item: item['cumulative_ms'], reverse=True)[:top]
+
+
+def benchmark_profile(settings_module: str, runs: int, top: int) -> dict:
+    """Метод замера холодного старта одного профиля настроек"""
+    walls, settings_times, setup_times = [], [], []
+    for _ in range(runs):
+        timings, wall, _ = _run_probe(settings_module)
+        walls.append(wall)
+        settings_times.append(timings['settings'])
+        setup_times.append(timings['setup'])
+
+    _, _, stderr = _run_probe(settings_module, importtime=True)
+    return {
+        'settings_module': settings_module,
+        'runs': runs,
+        'cold_start_ms': round(statistics.median(walls) * 1000, 2),
+        'settings_ms': round(statistics.median(settings_times) * 1000, 2),
+        'django_setup_ms': round(statistics.median(setup_times) * 1000, 2),
+        'slowest_imports': _parse_importtime(stderr, top),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=10, help='cold starts per profile')
+    parser.add_argument('--top', type=int, default=15, help='slowest imports to report')
+    parser.add_argument('--profile', choices=sorted(PROFILES), action='append',
+                        help='profile to measure, all by default')
+    parser.add_argument('--json', action='store_true', help='print the raw report as JSON')
+    args = parser.parse_args()
+
+    report = {name: benchmark_profile(PROFILES[name], args.runs, args.top)
+              for name in args.profile or PROFILES}
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    for name, result in report.items():
+        print(f'[{name}] {result["settings_module"]}: '
+              f'cold start {result["cold_start_ms"]} ms, '
+              f'settings {result["settings_ms"]} ms, '
+              f'django.setup() {result["django_setup_ms"]} ms '
+              f'(median of {result["runs"]})')
+        for module in result['slowest_imports']:
+            print(f'    {module["cumulative_ms"]:9.2f} ms  {module["self_ms"]:8.2f} ms  {module["module"]}')
+
+
+if __name__ == '__main__':
+    main()
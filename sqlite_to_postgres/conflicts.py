@@ -0,0 +1,302 @@
+import logging
+from enum import Enum
+from dataclasses import dataclass, fields
+from uuid import UUID
+
+from psycopg import ClientCursor
+
+# models
+from models import table_fabric
+
+logger = logging.getLogger('JournalDev')
+ID_MAP_TABLE = 'conflict_id_map'
+
+
+class Policy(Enum):
+    skip = 'skip'
+    upsert = 'upsert'
+    merge = 'merge'
+
+
+table_policies = {
+    'film_work': Policy.upsert,
+    'genre': Policy.merge,
+    'person': Policy.merge,
+    'genre_film_work': Policy.skip,
+    'person_film_work': Policy.skip
+}
+
+natural_keys = {
+    'genre': 'name',
+    'person': 'full_name'
+}
+
+foreign_keys = {
+    'genre_film_work': {'genre_id': 'genre', 'film_work_id': 'film_work'},
+    'person_film_work': {'person_id': 'person', 'film_work_id': 'film_work'}
+}
+
+# Повторы связей после переписывания ссылок. Для person_film_work ключ совпадает
+# с уникальным индексом film_work_person_idx, поэтому роль в нём не участвует
+link_keys = {
+    'genre_film_work': ('film_work_id', 'genre_id'),
+    'person_film_work': ('film_work_id', 'person_id')
+}
+
+
+@dataclass
+class ConflictReport:
+    table: str
+    policy: Policy
+    staged: int = 0
+    inserted: int = 0
+    updated: int = 0
+    merged: int = 0
+    relinked: int = 0
+    deduplicated: int = 0
+    dropped_roles: int = 0
+    skipped: int = 0
+
+    def __str__(self):
+        return (f'{self.table} [{self.policy.value}]: staged {self.staged}, inserted {self.inserted}, '
+                f'updated {self.updated}, merged {self.merged}, relinked {self.relinked}, '
+                f'deduplicated {self.deduplicated} (dropped roles {self.dropped_roles}), '
+                f'skipped {self.skipped}')
+
+
+def validate_policy(table_name: str, policy: Policy) -> None:
+    """Метод проверки, что политика применима к таблице"""
+    columns = [field.name for field in fields(table_fabric[table_name])]
+    if policy is not Policy.skip and 'modified' not in columns:
+        raise ValueError(f'Policy {policy.value} requires "modified" column in {table_name}')
+    if policy is Policy.merge and table_name not in natural_keys:
+        raise ValueError(f'Policy merge requires natural key for {table_name}')
+
+
+def parse_policies(value: str | None) -> dict[str, Policy]:
+    """Метод разбора политик из строки вида 'film_work=skip,person=merge'"""
+    policies = dict(table_policies)
+    for item in (value or '').split(','):
+        if not item.strip():
+            continue
+        table, _, policy = item.partition('=')
+        if table.strip() not in policies:
+            raise ValueError(f'Unknown table for conflict policy: {table}')
+        policies[table.strip()] = Policy(policy.strip())
+    for table_name, policy in policies.items():
+        validate_policy(table_name, policy)
+    return policies
+
+
+def staging_table(table_name: str) -> str:
+    return f'staging_{table_name}'
+
+
+def create_staging(pg_cursor: ClientCursor, table_name: str) -> str:
+    """Метод создания временной staging-таблицы, живёт до конца транзакции"""
+    pg_cursor.execute(f'CREATE TEMP TABLE IF NOT EXISTS {ID_MAP_TABLE} ('
+                      f'table_name TEXT, old_id UUID, new_id UUID, PRIMARY KEY (table_name, old_id));')
+    staging = staging_table(table_name)
+    pg_cursor.execute(f'CREATE TEMP TABLE {staging} (LIKE content.{table_name}) ON COMMIT DROP;')
+    return staging
+
+
+def _fetch_count(pg_cursor: ClientCursor, query: str, params: tuple = ()) -> int:
+    pg_cursor.execute(query, params)
+    row = pg_cursor.fetchone()
+    return row['count'] if row else 0
+
+
+def _relink(pg_cursor: ClientCursor, table_name: str, report: ConflictReport) -> None:
+    """Метод замены ссылок на слитые дубликаты в staging связующей таблицы.
+
+    Связи, ссылающиеся на не загруженную запись (new_id IS NULL), удаляются из staging
+    и тоже запоминаются, чтобы test_transfer их не ожидал.
+    """
+    staging = staging_table(table_name)
+    for column, ref_table in foreign_keys.get(table_name, {}).items():
+        pg_cursor.execute(
+            f'WITH removed AS ('
+            f'  DELETE FROM {staging} s USING {ID_MAP_TABLE} m '
+            f'  WHERE m.table_name = %s AND m.old_id = s.{column} AND m.new_id IS NULL RETURNING s.id'
+            f') INSERT INTO {ID_MAP_TABLE} (table_name, old_id, new_id) '
+            f'SELECT %s, id, NULL FROM removed ON CONFLICT (table_name, old_id) DO NOTHING;',
+            (ref_table, table_name)
+        )
+        pg_cursor.execute(f'UPDATE {staging} s SET {column} = m.new_id FROM {ID_MAP_TABLE} m '
+                          f'WHERE m.table_name = %s AND m.old_id = s.{column} AND m.new_id IS NOT NULL;',
+                          (ref_table,))
+        report.relinked += pg_cursor.rowcount
+
+
+def _deduplicate_links(pg_cursor: ClientCursor, table_name: str,
+                       columns: list[str], report: ConflictReport) -> None:
+    """Метод удаления повторных связей, появившихся после переписывания ссылок.
+
+    Связь, уже существующая в Postgres под другим id, и повторы внутри staging
+    удаляются, их id запоминаются вместе с id оставшейся связи. Если у удалённой
+    связи была другая роль, это пишется в лог и в отчёт.
+    """
+    staging = staging_table(table_name)
+    key = link_keys[table_name]
+    role, s_role, c_role = ('role', 's.role', 'c.role') if 'role' in columns else ('NULL::text',) * 3
+    same_key = ' AND '.join(f'c.{name} = s.{name}' for name in key)
+    pg_cursor.execute(
+        f'WITH removed AS ('
+        f'  DELETE FROM {staging} s USING content.{table_name} c '
+        f'  WHERE {same_key} AND c.id <> s.id '
+        f'  AND NOT EXISTS (SELECT 1 FROM content.{table_name} x WHERE x.id = s.id) '
+        f'  RETURNING s.id AS old_id, c.id AS new_id, {s_role} AS old_role, {c_role} AS new_role'
+        f'), mapped AS ('
+        f'  INSERT INTO {ID_MAP_TABLE} (table_name, old_id, new_id) '
+        f'  SELECT %s, old_id, new_id FROM removed '
+        f'  ON CONFLICT (table_name, old_id) DO UPDATE SET new_id = EXCLUDED.new_id'
+        f') SELECT count(*) AS removed, '
+        f'count(*) FILTER (WHERE old_role IS DISTINCT FROM new_role) AS dropped_roles FROM removed;',
+        (table_name,)
+    )
+    removed = pg_cursor.fetchone()
+    report.deduplicated += removed['removed']
+    report.dropped_roles += removed['dropped_roles']
+
+    key_str = ', '.join(key)
+    window = f'OVER (PARTITION BY {key_str} ORDER BY created NULLS LAST, id)'
+    pg_cursor.execute(
+        f'WITH ranked AS ('
+        f'  SELECT id, {role} AS old_role, first_value(id) {window} AS new_id, '
+        f'  first_value({role}) {window} AS new_role FROM {staging}'
+        f'), removed AS ('
+        f'  DELETE FROM {staging} s USING ranked r '
+        f'  WHERE s.id = r.id AND r.id <> r.new_id RETURNING r.id AS old_id, r.new_id, r.old_role, r.new_role'
+        f'), mapped AS ('
+        f'  INSERT INTO {ID_MAP_TABLE} (table_name, old_id, new_id) '
+        f'  SELECT %s, old_id, new_id FROM removed '
+        f'  ON CONFLICT (table_name, old_id) DO UPDATE SET new_id = EXCLUDED.new_id'
+        f') SELECT count(*) AS removed, '
+        f'count(*) FILTER (WHERE old_role IS DISTINCT FROM new_role) AS dropped_roles FROM removed;',
+        (table_name,)
+    )
+    removed = pg_cursor.fetchone()
+    report.deduplicated += removed['removed']
+    report.dropped_roles += removed['dropped_roles']
+
+    if report.dropped_roles:
+        logger.warning(f'{table_name}: {report.dropped_roles} duplicate links with a different role '
+                       f'were not loaded, see {ID_MAP_TABLE} for their ids')
+
+
+def _map_natural_duplicates(pg_cursor: ClientCursor, table_name: str) -> None:
+    """Метод сопоставления дубликатов по естественному ключу.
+
+    Победитель - существующая в Postgres запись, иначе самая свежая запись из источника.
+    Id проигравших запоминаются для переписывания ссылок в связующих таблицах.
+    """
+    staging = staging_table(table_name)
+    key = natural_keys[table_name]
+    pg_cursor.execute(
+        f'INSERT INTO {ID_MAP_TABLE} (table_name, old_id, new_id) '
+        f'SELECT %s, s.id, COALESCE(c.id, w.id) FROM {staging} s '
+        f'JOIN (SELECT DISTINCT ON ({key}) id, {key} FROM {staging} '
+        f'      ORDER BY {key}, modified DESC NULLS LAST, id) w ON w.{key} = s.{key} '
+        f'LEFT JOIN content.{table_name} c ON c.{key} = s.{key} '
+        f'WHERE s.id <> COALESCE(c.id, w.id) '
+        f'ON CONFLICT (table_name, old_id) DO UPDATE SET new_id = EXCLUDED.new_id;',
+        (table_name,)
+    )
+
+
+def _update_merge_winners(pg_cursor: ClientCursor, table_name: str, columns: list[str]) -> int:
+    """Метод обновления победителя слияния данными более свежего дубликата"""
+    staging = staging_table(table_name)
+    update_columns = [name for name in columns if name != 'id']
+    assignments = ', '.join(f'{name} = s.{name}' for name in update_columns)
+    pg_cursor.execute(
+        f'UPDATE content.{table_name} c SET {assignments} FROM ('
+        f'  SELECT DISTINCT ON (m.new_id) m.new_id, {", ".join(f"st.{name}" for name in update_columns)} '
+        f'  FROM {staging} st JOIN {ID_MAP_TABLE} m ON m.table_name = %s AND m.old_id = st.id '
+        f'  ORDER BY m.new_id, st.modified DESC NULLS LAST'
+        f') s WHERE c.id = s.new_id AND c.modified < s.modified;',
+        (table_name,)
+    )
+    return pg_cursor.rowcount
+
+
+def _drop_mapped(pg_cursor: ClientCursor, table_name: str) -> int:
+    staging = staging_table(table_name)
+    pg_cursor.execute(f'DELETE FROM {staging} s USING {ID_MAP_TABLE} m '
+                      f'WHERE m.table_name = %s AND m.old_id = s.id;', (table_name,))
+    return pg_cursor.rowcount
+
+
+def _record_unwritten(pg_cursor: ClientCursor, table_name: str) -> None:
+    """Метод запоминания строк, не попавших в Postgres по другому уникальному ограничению"""
+    staging = staging_table(table_name)
+    pg_cursor.execute(
+        f'INSERT INTO {ID_MAP_TABLE} (table_name, old_id, new_id) '
+        f'SELECT %s, s.id, NULL FROM {staging} s '
+        f'WHERE NOT EXISTS (SELECT 1 FROM content.{table_name} c WHERE c.id = s.id) '
+        f'ON CONFLICT (table_name, old_id) DO NOTHING;',
+        (table_name,)
+    )
+    if pg_cursor.rowcount:
+        logger.warning(f'{table_name}: {pg_cursor.rowcount} rows were not loaded because of '
+                       f'a unique constraint, see {ID_MAP_TABLE} for their ids')
+
+
+def resolve_conflicts(pg_cursor: ClientCursor, table_name: str,
+                      columns: list[str], policy: Policy) -> ConflictReport:
+    """Метод переноса данных из staging в content.<table> согласно политике конфликтов.
+
+    Дубликаты по естественному ключу с другим id обрабатываются до вставки при любой
+    политике: merge сливает их с обновлением победителя, skip и upsert только
+    пропускают и переписывают на них ссылки.
+    """
+    validate_policy(table_name, policy)
+
+    staging = staging_table(table_name)
+    pg_cursor.execute(f'ANALYZE {staging};')
+    report = ConflictReport(table_name, policy)
+    report.staged = _fetch_count(pg_cursor, f'SELECT count(*) AS count FROM {staging};')
+
+    _relink(pg_cursor, table_name, report)
+    if table_name in link_keys:
+        _deduplicate_links(pg_cursor, table_name, columns, report)
+    if table_name in natural_keys:
+        _map_natural_duplicates(pg_cursor, table_name)
+        if policy is Policy.merge:
+            report.updated += _update_merge_winners(pg_cursor, table_name, columns)
+            report.merged += _drop_mapped(pg_cursor, table_name)
+        else:
+            report.deduplicated += _drop_mapped(pg_cursor, table_name)
+
+    column_names_str = ', '.join(columns)
+    if policy is Policy.skip:
+        on_conflict = 'ON CONFLICT DO NOTHING'
+    else:
+        assignments = ', '.join(f'{name} = EXCLUDED.{name}' for name in columns if name != 'id')
+        on_conflict = (f'ON CONFLICT (id) DO UPDATE SET {assignments} '
+                       f'WHERE content.{table_name}.modified < EXCLUDED.modified')
+
+    pg_cursor.execute(
+        f'WITH applied AS ('
+        f'  INSERT INTO content.{table_name} ({column_names_str}) '
+        f'  SELECT {column_names_str} FROM {staging} {on_conflict} '
+        f'  RETURNING (xmax = 0) AS inserted'
+        f') SELECT count(*) FILTER (WHERE inserted) AS inserted, '
+        f'count(*) FILTER (WHERE NOT inserted) AS updated FROM applied;'
+    )
+    applied = pg_cursor.fetchone()
+    report.inserted += applied['inserted']
+    report.updated += applied['updated']
+    report.skipped = report.staged - report.merged - report.deduplicated - applied['inserted'] - applied['updated']
+    _record_unwritten(pg_cursor, table_name)
+    return report
+
+
+def get_id_map(pg_cursor: ClientCursor, table_name: str) -> dict[UUID, UUID]:
+    """Метод получения id, не загруженных как есть: слитых, повторов и пропущенных (new_id NULL)"""
+    pg_cursor.execute('SELECT to_regclass(%s) AS exists;', (ID_MAP_TABLE,))
+    if pg_cursor.fetchone()['exists'] is None:
+        return {}
+    pg_cursor.execute(f'SELECT old_id, new_id FROM {ID_MAP_TABLE} WHERE table_name = %s;', (table_name,))
+    return {row['old_id']: row['new_id'] for row in pg_cursor.fetchall()}
@@ -10,6 +10,7 @@ from dotenv import load_dotenv
 
 # loaders
 from loaders import get_all_table_names_sqlite, load_data, test_transfer
+from conflicts import parse_policies
 
 load_dotenv()
 logging.config.fileConfig('logging.conf')
@@ -25,6 +26,7 @@ DSL = {
 
 
 def main() -> None:
+    policies = parse_policies(os.getenv('CONFLICT_POLICIES'))
     with closing(sqlite3.connect(os.getenv('SQLITE_PATH'))) as sqlite_conn, closing(psycopg.connect(
             **DSL, row_factory=dict_row, cursor_factory=ClientCursor)) as pg_conn:
 
@@ -36,10 +38,10 @@ def main() -> None:
                 logger.error('SQLite. Not found tables for migration')
                 raise ValueError('SQLite. Not found tables for migration')
             for tbl_name in table_names_sqlite:
-                load_data(sqlite_cur, pg_cur, tbl_name)
+                report = load_data(sqlite_cur, pg_cur, tbl_name, policies)
                 pg_conn.commit()
-                logger.info(f'Migrate table {tbl_name} is finished')
-                test_transfer(sqlite_cur, pg_cur, tbl_name)
+                logger.info(f'Migrate table {tbl_name} is finished :: {report}')
+                test_transfer(sqlite_cur, pg_cur, tbl_name, policies)
 
 
 
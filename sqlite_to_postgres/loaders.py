@@ -1,12 +1,14 @@
 import sqlite3
 import logging
 from psycopg import ClientCursor
-from dataclasses import dataclass, astuple, fields
+from dataclasses import dataclass, fields
 from datetime import datetime
 from typing import Generator
 
 # models
 from models import table_fabric, DifferentColumn
+from conflicts import (ConflictReport, Policy, create_staging, foreign_keys, get_id_map,
+                       resolve_conflicts, table_policies)
 
 logger = logging.getLogger('JournalDev')
 BATCH_SIZE = 100
@@ -48,23 +50,28 @@ def transform_data(sqlite_cursor: sqlite3.Cursor,
         yield [table_fabric[table_name](**_reform_data(dict(row))) for row in batch]
 
 
-def load_data(sqlite_cursor: sqlite3.Cursor, pg_cursor: ClientCursor, table_name: str) -> None:
-    """Основной метод загрузки данных из SQLite в Postgres"""
+def load_data(sqlite_cursor: sqlite3.Cursor, pg_cursor: ClientCursor, table_name: str,
+              policies: dict[str, Policy] = table_policies) -> ConflictReport:
+    """Основной метод загрузки данных из SQLite в Postgres.
+
+    Пачки пишутся в staging-таблицу через COPY, конфликты разрешаются запросами на всю таблицу.
+    """
     pg_column_names = [field.name for field in fields(table_fabric[table_name])]
     column_names_str = ', '.join(pg_column_names)
-    placeholder = ', '.join(['%s'] * len(pg_column_names))
 
-    for batch in transform_data(sqlite_cursor, table_name, column_names_str):
-        bind_values = ', '.join(
-            pg_cursor.mogrify(f'({placeholder})', astuple(item)) for item in batch
-        )
-        query_insert_to_pg = (f'INSERT INTO content.{table_name} ({column_names_str}) '
-                              f'VALUES {bind_values} ON CONFLICT (id) DO NOTHING;')
-        try:
-            pg_cursor.execute(query_insert_to_pg)
-        except Exception as err:
-            logger.error(f'Getting exception :: %err', err)
-            raise ValueError(f'There are errors when recording to postgres')
+    try:
+        staging = create_staging(pg_cursor, table_name)
+        with pg_cursor.copy(f'COPY {staging} ({column_names_str}) FROM STDIN') as copy:
+            for batch in transform_data(sqlite_cursor, table_name, column_names_str):
+                for item in batch:
+                    # astuple делает deepcopy каждого значения, на больших таблицах это основное время загрузки
+                    copy.write_row(tuple(getattr(item, name) for name in pg_column_names))
+        report = resolve_conflicts(pg_cursor, table_name, pg_column_names, policies[table_name])
+    except Exception as err:
+        logger.error(f'Getting exception :: %err', err)
+        raise ValueError(f'There are errors when recording to postgres')
+    logger.info(f'Conflicts resolved :: {report}')
+    return report
 
 
 def get_all_table_names_sqlite(cursor: sqlite3.Cursor) -> list[str]:
@@ -74,20 +81,52 @@ def get_all_table_names_sqlite(cursor: sqlite3.Cursor) -> list[str]:
     return sorted([tbl['name'] for tbl in cursor.fetchall()])
 
 
-def test_transfer(sqlite_cursor: sqlite3.Cursor, pg_cursor: ClientCursor, table: str) -> None:
-    """Метод проверки данных после загрузки в Postgres"""
+def _relink_item(item: dataclass, relinks: dict[str, dict]) -> dataclass:
+    """Метод замены ссылок на слитые дубликаты, как это сделано при загрузке"""
+    for column, id_map in relinks.items():
+        setattr(item, column, id_map.get(getattr(item, column), getattr(item, column)))
+    return item
+
+
+def _is_kept_newer(original: dataclass, transferred: dataclass) -> bool:
+    """Запись в Postgres не перезаписана источником, потому что она не старше его"""
+    if original.modified is None or transferred.modified is None:
+        return True
+    return transferred.modified >= original.modified
+
+
+def test_transfer(sqlite_cursor: sqlite3.Cursor, pg_cursor: ClientCursor, table: str,
+                  policies: dict[str, Policy] = table_policies) -> None:
+    """Метод проверки данных после загрузки в Postgres.
+
+    Для skip записи должны совпасть с источником. Для upsert и merge запись в Postgres
+    может отличаться, если она не старше источника: такие записи политика не перезаписывает.
+    """
     logger.info(f'Checking table: {table}')
     pg_column_names = [field.name for field in fields(table_fabric[table])]
     column_names_str = ', '.join(pg_column_names)
     query_sqlite = f'SELECT {column_names_str} FROM {table}'
     sqlite_cursor.execute(_replace_column_name(query_sqlite))
+    merged_ids = get_id_map(pg_cursor, table)
+    relinks = {column: get_id_map(pg_cursor, ref_table)
+               for column, ref_table in foreign_keys.get(table, {}).items()}
 
     while batch := sqlite_cursor.fetchmany(BATCH_SIZE):
-        original_batch = [table_fabric[table](**_reform_data(dict(row))) for row in batch]
+        original_batch = [_relink_item(table_fabric[table](**_reform_data(dict(row))), relinks)
+                          for row in batch]
+        original_batch = [item for item in original_batch if item.id not in merged_ids]
+        if not original_batch:
+            continue
         ids = [item.id for item in original_batch]
         pg_cursor.execute(f'SELECT * FROM content.{table} WHERE id = ANY(%s)', [ids])
         transferred_batch = [table_fabric[table](**dict(row)) for row in pg_cursor.fetchall()]
 
         assert len(original_batch) == len(transferred_batch)
-        assert sorted(original_batch, key=lambda item: item.id) == sorted(transferred_batch, key=lambda item: item.id)
+        original_batch.sort(key=lambda item: item.id)
+        transferred_batch.sort(key=lambda item: item.id)
+        if policies[table] is Policy.skip:
+            assert original_batch == transferred_batch
+            continue
+        for original, transferred in zip(original_batch, transferred_batch):
+            assert original == transferred or _is_kept_newer(original, transferred)
     logger.info(f'ok {table}')